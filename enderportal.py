@@ -10,7 +10,16 @@ Then follow the prompts.
 """
 
 import math
+import os
 import sys
+from typing import Optional
+
+import numpy as np
+
+# Opt in to the Numba-compiled stronghold kernel with ENDERPORTAL_JIT=1.
+# Importing and compiling Numba costs far more than a NumPy call, so it
+# only pays off when generate_strongholds runs many times per process.
+USE_JIT = os.environ.get("ENDERPORTAL_JIT", "") == "1"
 
 # --- Stronghold ring layout for Java 1.9+ ---
 # Distances are from (0,0) in OVERWORLD blocks.
@@ -29,6 +38,30 @@ RING_RADII = [
     (22912, 24192), # ring 7
 ]
 
+# Typed copies of the ring tables, built once at import.
+_COUNTS = np.array(RING_STRONGHOLDS, dtype=np.int64)
+_RMIN = np.array([r[0] for r in RING_RADII], dtype=np.float32)
+_RMAX = np.array([r[1] for r in RING_RADII], dtype=np.float32)
+_TOTAL = int(_COUNTS.sum())  # 128
+# Per-stronghold lookups: which ring it's on and its index within that ring.
+_RING_IDX = np.repeat(np.arange(len(RING_STRONGHOLDS), dtype=np.int64), _COUNTS)
+_LOCAL_IDX = np.concatenate([np.arange(c, dtype=np.int64) for c in RING_STRONGHOLDS])
+# Angular spacing between neighbouring strongholds, per ring.
+_TWO_PI_OVER_COUNT = 2 * np.pi / _COUNTS
+
+_HASH_INITIAL = 1125899906842597  # large prime
+_U64_MASK = 0xFFFFFFFFFFFFFFFF
+
+def _hash_powers(n: int) -> np.ndarray:
+    """
+    31**(n-1), ..., 31**1, 31**0 (mod 2**64): the Horner weights for a
+    string of length n. The cumulative product wraps mod 2**64 in uint64.
+    """
+    powers = np.ones(n, dtype=np.uint64)
+    if n > 1:
+        powers[1:] = np.cumprod(np.full(n - 1, 31, dtype=np.uint64))
+    return powers[::-1]
+
 def java_like_seed_from_string(s: str) -> int:
     """
     Very rough stand-in for how Minecraft converts non-numeric seeds.
@@ -40,14 +73,41 @@ def java_like_seed_from_string(s: str) -> int:
     try:
         return int(s)
     except ValueError:
-        # simple deterministic hash into 64-bit signed range
-        h = 1125899906842597  # large prime
-        for ch in s:
-            h = (31 * h + ord(ch)) & 0xFFFFFFFFFFFFFFFF
+        # simple deterministic hash into 64-bit signed range:
+        # h = 31*h + ord(ch) over the string, evaluated as one dot product
+        # of the code points with powers of 31 (uint64 wraps mod 2**64)
+        n = len(s)
+        # surrogatepass: lone surrogates (e.g. from surrogateescape'd input)
+        # still encode to their code point, exactly like ord() sees them
+        raw = s.encode("utf-32-le", "surrogatepass")
+        codes = np.frombuffer(raw, dtype=np.uint32).astype(np.uint64)
+        h = (_HASH_INITIAL * pow(31, n, 1 << 64)
+             + int((codes * _hash_powers(n)).sum())) & _U64_MASK
         if h >= 2**63:
             h -= 2**63 * 2
         return h
 
+# LCG parameters: s' = (a*s + c) mod 2**48
+LCG_A = 25214903917
+LCG_C = 11
+LCG_MASK = (1 << 48) - 1
+
+def _lcg_jump_tables(n: int):
+    """
+    Precompute (A_k, C_k) for k = 1..n so that the k-th successor of a seed
+    s is (A_k*s + C_k) mod 2**48. Products are taken in uint64, which wraps
+    mod 2**64 and therefore stays exact mod 2**48.
+    """
+    a_pow = np.empty(n, dtype=np.uint64)
+    c_pow = np.empty(n, dtype=np.uint64)
+    a_k, c_k = 1, 0
+    for k in range(n):
+        a_k = (LCG_A * a_k) & LCG_MASK
+        c_k = (LCG_A * c_k + LCG_C) & LCG_MASK
+        a_pow[k] = a_k
+        c_pow[k] = c_k
+    return a_pow, c_pow
+
 def rng_next(seed: int) -> int:
     """
     Very small custom linear congruential generator (LCG),
@@ -56,10 +116,7 @@ def rng_next(seed: int) -> int:
     NOTE: This is NOT Mojang's exact Java Random implementation;
     it only exists so angles depend on the seed in a repeatable way.
     """
-    a = 25214903917
-    c = 11
-    m = 2**48
-    return (a * (seed & (m - 1)) + c) % m
+    return (LCG_A * (seed & LCG_MASK) + LCG_C) & LCG_MASK
 
 def rng_double(seed: int) -> (float, int):
     """
@@ -70,65 +127,178 @@ def rng_double(seed: int) -> (float, int):
     value = (new_seed >> 22) / float(1 << 26)
     return value, new_seed
 
+def rng_doubles(seed: int, n: int) -> np.ndarray:
+    """
+    Batch version of rng_double: the next n floats in [0,1) from seed,
+    identical to calling rng_double n times in a row.
+    """
+    if n <= len(_JUMP_A):
+        a_pow, c_pow = _JUMP_A[:n], _JUMP_C[:n]
+    else:
+        a_pow, c_pow = _lcg_jump_tables(n)
+    seeds = (a_pow * np.uint64(seed & LCG_MASK) + c_pow) & np.uint64(LCG_MASK)
+    return (seeds >> np.uint64(22)).astype(np.float64) / float(1 << 26)
+
+# Positions of each ring's draws within one seed's batch of random values.
+_DRAWS_PER_SEED = _TOTAL + 2 * len(RING_STRONGHOLDS)
+_FRAC_POS = np.cumsum([0] + [2 + c for c in RING_STRONGHOLDS[:-1]])
+_JITTER_POS = np.concatenate(
+    [np.arange(c) + pos + 2 for pos, c in zip(_FRAC_POS, RING_STRONGHOLDS)]
+)
+_JUMP_A, _JUMP_C = _lcg_jump_tables(_DRAWS_PER_SEED)
+
+def _gen_kernel(counts, r_min, r_max, fracs, base_fracs, jitter_fracs,
+                out_x, out_z, out_ring, out_idx, out_r):
+    """
+    Fused stronghold math: fill the out_* arrays in a single pass.
+    Compiled with Numba on first use when USE_JIT is set (see _jit_kernel).
+    """
+    k = 0
+    for ring in range(counts.shape[0]):
+        radius = r_min[ring] + fracs[ring] * (r_max[ring] - r_min[ring])
+        base = base_fracs[ring] * 2.0 * math.pi
+        c = counts[ring]
+        # loop invariants: spacing between strongholds and ±20% jitter range
+        two_pi_over_count = 2.0 * math.pi / c
+        jitter_scale = two_pi_over_count * 0.4
+        for i in range(c):
+            angle = (base + two_pi_over_count * i
+                     + (jitter_fracs[k] - 0.5) * jitter_scale)
+            out_x[k] = radius * math.cos(angle)
+            out_z[k] = radius * math.sin(angle)
+            out_ring[k] = ring
+            out_idx[k] = i
+            out_r[k] = radius
+            k += 1
+
+_compiled_kernel = None
+
+def _jit_kernel():
+    """
+    Return _gen_kernel compiled with Numba, importing Numba lazily on the
+    first call. Returns None if Numba is not installed.
+    """
+    global _compiled_kernel
+    if _compiled_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:  # Numba is optional; use the NumPy path
+            return None
+        _compiled_kernel = njit(cache=True, fastmath=True)(_gen_kernel)
+    return _compiled_kernel
+
 def generate_strongholds(seed_input: str):
     """
     Generate approximate stronghold positions for Java 1.9+ worlds.
 
-    Returns a list of dicts:
-        { "ring": int, "index": int, "x": float, "z": float, "radius": float }
+    Returns a dict of parallel NumPy arrays (one entry per stronghold):
+        { "ring": int64[], "index": int64[], "x": float32[],
+          "z": float32[], "radius": float32[] }
+
+    Positions are approximate anyway, so coordinates are stored as float32
+    (the math itself runs in float64, with or without Numba).
     """
     base_seed = java_like_seed_from_string(seed_input)
 
-    strongholds = []
     # Start an internal RNG seed derived from the world seed to vary angles
     internal_seed = (base_seed ^ 0x5DEECE66D) & ((1 << 48) - 1)
 
-    for ring_index, (count, (r_min, r_max)) in enumerate(zip(RING_STRONGHOLDS, RING_RADII)):
-        # pick a radius in the ring for this ring (approximate)
-        frac, internal_seed = rng_double(internal_seed)
-        radius = r_min + frac * (r_max - r_min)
+    # Draw every random value in one batch. The draw order matches the
+    # original per-stronghold loop: per ring a radius fraction, a base angle
+    # fraction, then one jitter fraction per stronghold in that ring.
+    draws = rng_doubles(internal_seed, _DRAWS_PER_SEED)
+    fracs = draws[_FRAC_POS]
+    base_fracs = draws[_FRAC_POS + 1]
+    jitter_fracs = draws[_JITTER_POS]
 
-        # base rotation per ring, depends on seed so worlds differ
-        base_angle_frac, internal_seed = rng_double(internal_seed)
-        base_angle = base_angle_frac * 2.0 * math.pi
+    kernel = _jit_kernel() if USE_JIT else None
+    if kernel is not None:
+        out = {
+            "ring": np.empty(_TOTAL, dtype=np.int64),
+            "index": np.empty(_TOTAL, dtype=np.int64),
+            "x": np.empty(_TOTAL, dtype=np.float32),
+            "z": np.empty(_TOTAL, dtype=np.float32),
+            "radius": np.empty(_TOTAL, dtype=np.float32),
+        }
+        kernel(_COUNTS, _RMIN, _RMAX, fracs, base_fracs, jitter_fracs,
+               out["x"], out["z"], out["ring"], out["index"], out["radius"])
+        return out
 
-        # distribute strongholds roughly evenly around the ring
-        for i in range(count):
-            # Slight per-stronghold angle jitter depending on seed
-            jitter_frac, internal_seed = rng_double(internal_seed)
-            jitter = (jitter_frac - 0.5) * (2 * math.pi / count * 0.4)  # ±20% of spacing
+    # pick a radius in the ring for each ring (approximate)
+    ring_radius = _RMIN + fracs * (_RMAX - _RMIN)
+    # base rotation per ring, depends on seed so worlds differ
+    base_angles = base_fracs * 2.0 * math.pi
 
-            angle = base_angle + (2.0 * math.pi * i / count) + jitter
+    # distribute strongholds roughly evenly around the ring, with a slight
+    # per-stronghold angle jitter (±20% of spacing) depending on seed
+    spacing = _TWO_PI_OVER_COUNT[_RING_IDX]
+    jitters = (jitter_fracs - 0.5) * (spacing * 0.4)
+    angles = base_angles[_RING_IDX] + spacing * _LOCAL_IDX + jitters
 
-            x = radius * math.cos(angle)
-            z = radius * math.sin(angle)
+    # same precision policy as _gen_kernel: compute in float64, store float32
+    radius = ring_radius[_RING_IDX]
+    return {
+        "ring": _RING_IDX.copy(),
+        "index": _LOCAL_IDX.copy(),
+        "x": (radius * np.cos(angles)).astype(np.float32),
+        "z": (radius * np.sin(angles)).astype(np.float32),
+        "radius": radius.astype(np.float32),
+    }
 
-            strongholds.append({
-                "ring": ring_index,
-                "index": i,
-                "x": x,
-                "z": z,
-                "radius": radius,
-            })
+def distance(x1, z1, x2, z2) -> float:
+    return math.hypot(x2 - x1, z2 - z1)
 
-    return strongholds
+# Largest search radius whose square is still a finite float.
+_SQRT_FLOAT_MAX = math.sqrt(sys.float_info.max)
 
-def distance(x1, z1, x2, z2) -> float:
-    dx = x2 - x1
-    dz = z2 - z1
-    return math.sqrt(dx*dx + dz*dz)
-
-def find_nearby_strongholds(strongholds, player_x, player_z, max_distance):
-    results = []
-    for sh in strongholds:
-        d = distance(player_x, player_z, sh["x"], sh["z"])
-        if d <= max_distance:
-            entry = dict(sh)
-            entry["distance"] = d
-            results.append(entry)
+def find_nearby_strongholds(strongholds, player_x, player_z, max_distance,
+                            top_k: Optional[int] = None):
+    """
+    Return the strongholds within max_distance of the player, nearest first,
+    as a list of dicts:
+        { "ring", "index", "x", "z", "radius", "distance" }
+
+    If top_k is given, only the top_k nearest of those are returned.
+    """
+    if max_distance < 0 or (top_k is not None and top_k <= 0):
+        # nothing is closer than a negative distance (and squaring below
+        # would otherwise turn it into a positive cutoff)
+        return []
+
+    # distances in float64 (coordinates are only stored as float32); huge
+    # inputs overflow to inf, which compares the same way the plain
+    # Python math would, so don't warn about it
+    with np.errstate(over="ignore"):
+        dx = strongholds["x"] - np.float64(player_x)
+        dz = strongholds["z"] - np.float64(player_z)
+        d2 = dx * dx + dz * dz
+    if not max_distance >= _SQRT_FLOAT_MAX:  # also takes nan (matches nothing)
+        cutoff = float(max_distance) ** 2
+    elif max_distance == math.inf:
+        cutoff = math.inf
+    else:
+        # squaring would overflow; every finite d2 is within this radius
+        cutoff = sys.float_info.max
+
+    # filter on squared distance so only the survivors need a sqrt
+    keep = np.flatnonzero(d2 <= cutoff)
+    if top_k is not None and top_k < keep.size:
+        # partial select the top_k nearest so only those need sorting
+        keep = keep[np.argpartition(d2[keep], top_k - 1)[:top_k]]
     # sort by distance ascending
-    results.sort(key=lambda s: s["distance"])
-    return results
+    keep = keep[np.argsort(d2[keep], kind="stable")]
+    dist = np.sqrt(d2[keep])
+
+    # slice each column once and convert it to Python scalars in bulk
+    columns = [
+        strongholds[field][keep].tolist()
+        for field in ("ring", "index", "x", "z", "radius")
+    ]
+    return [
+        {"ring": ring, "index": index, "x": x, "z": z,
+         "radius": radius, "distance": d}
+        for ring, index, x, z, radius, d in zip(*columns, dist.tolist())
+    ]
 
 def pretty_print_results(results):
     if not results:
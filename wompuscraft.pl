@@ -315,4 +315,61 @@ recommend_next_action_overall_with_hint(Player, Objective, ItemToBuild, NeededRa
     findall(Hint,
             (member(_Qty-RawItem, NeededRaw),
              where_to_get(RawItem, Hint)),
-            Hints).
\ No newline at end of file
+            Hints).
+
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+%% BULK REPORT (ONE QUERY)
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+
+% bulk_report(+Player, +Objectives, -DefaultOrder, -NextObj, -NextMissing,
+%             -Obj, -Item, -NeededRaw, -Hints, -PerItems, -PerRaw, -PerMissing)
+% Everything a front end usually asks for, answered in a single query.
+% Goals that have no answer (e.g. all objectives done) yield `none` / [].
+% PerItems, PerRaw and PerMissing are aligned with Objectives.
+
+bulk_report(Player, Objectives, DefaultOrder, NextObj, NextMissing,
+            Obj, Item, NeededRaw, Hints, PerItems, PerRaw, PerMissing) :-
+    default_objective_order(DefaultOrder),
+    (   next_objective(Player, NextObj, NextMissing)
+    ->  true
+    ;   NextObj = none, NextMissing = []
+    ),
+    (   recommend_next_action_overall_with_hint(Player, Obj, Item, NeededRaw, Hints)
+    ->  true
+    ;   Obj = none, Item = none, NeededRaw = [], Hints = []
+    ),
+    maplist(objective_report(Player), Objectives, PerItems, PerRaw, PerMissing).
+
+% objective_report(+Player, +Objective, -Item, -NeededRaw, -Missing)
+objective_report(Player, Objective, Item, NeededRaw, Missing) :-
+    (   missing_items(Player, Objective, Missing)
+    ->  true
+    ;   Missing = []
+    ),
+    objective_recommendation(Player, Objective, Item, NeededRaw).
+
+% objective_recommendation(+Player, +Objective, -Item, -NeededRaw)
+% recommend_next_action/4, but yielding `none` / [] instead of failing,
+% so a finished objective cannot make bulk_report/12 or concurrent/3 fail.
+objective_recommendation(Player, Objective, Item, NeededRaw) :-
+    (   recommend_next_action(Player, Objective, Item, NeededRaw)
+    ->  true
+    ;   Item = none, NeededRaw = []
+    ).
+
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+%% PARALLEL PER-OBJECTIVE REPORTS
+%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+
+% concurrent_objective_reports(+Player, +Objectives, +Threads,
+%                              -Items, -NeededRaws)
+% Run objective_recommendation/4 for every objective on up to Threads
+% worker threads. Results are aligned with Objectives. Tables are private
+% to each thread, so workers do not share tabled answers.
+
+concurrent_objective_reports(Player, Objectives, Threads, Items, NeededRaws) :-
+    maplist(objective_recommendation_goal(Player), Objectives, Items, NeededRaws, Goals),
+    concurrent(Threads, Goals, []).
+
+objective_recommendation_goal(Player, Objective, Item, NeededRaw,
+                              objective_recommendation(Player, Objective, Item, NeededRaw)).
@@ -1,32 +1,206 @@
 # wompuscraft_wrapper.py
 
-from typing import Any, Dict, List, Union
+import functools
+import os
+import re
+import threading
+import weakref
+from typing import (
+    Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+)
 from pyswip import Prolog
 
 
+class NeededRaw(NamedTuple):
+    """
+    One raw material requirement, e.g. NeededRaw(item='wood_log', qty=3).
+    """
+
+    item: str
+    qty: int
+
+
+# Frozen (hashable, immutable) form of a NeededRaw list, as stored in the
+# query caches.
+FrozenNeededRaw = Tuple[NeededRaw, ...]
+
+# Matches the string form of a qty-item pair, e.g. "3-wood_log".
+_QTY_ITEM_RE = re.compile(r"\s*(-?\d+)\s*-\s*(\w+)")
+
+# Matches a qty-item pair as pyswip's query() returns it by default
+# (normalized to canonical text), e.g. "-(3, wood_log)".
+_PAIR_TERM_RE = re.compile(r"-\(\s*(-?\d+)\s*,\s*(.+?)\s*\)")
+
+# Names that can be written as a Prolog atom without quotes.
+_PLAIN_ATOM_RE = re.compile(r"[a-z][A-Za-z0-9_]*")
+
+
+def _atom(name: str) -> str:
+    """
+    Return name as Prolog atom text for a query, quoting and escaping it
+    when needed (so e.g. "Steve" is not read as a variable).
+    """
+    if _PLAIN_ATOM_RE.fullmatch(name):
+        return name
+    escaped = name.replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
 class WompusCraftExpertSystem:
     """
     Thin Python wrapper around the wompuscraft.pl Prolog knowledge base.
+
+    Query results are memoized per instance and (player, objective), and
+    the heavier recommendation predicates are tabled inside SWI-Prolog;
+    call invalidate() after changing game state in the knowledge base.
     """
 
+    # Predicates tabled after consulting the knowledge base. Their answers
+    # are reused across overlapping queries until abolish_all_tables().
+    TABLED_PREDICATES = (
+        "recommend_next_action/4",
+        "missing_items/3",
+        "needed_raw_for_item/2",
+        "default_objective_order/1",
+    )
+
+    # Query templates, filled in with str.format() per call.
+    MISSING_ITEMS_QUERY = "missing_items({player}, {objective}, Missing)"
+    NEXT_OBJECTIVE_QUERY = "next_objective({player}, Objective, Missing)"
+    DEFAULT_OBJECTIVES_QUERY = "default_objective_order(Objs)"
+    RECOMMEND_OVERALL_QUERY = (
+        "recommend_next_action_overall({player}, Objective, Item, NeededRaw)"
+    )
+    RECOMMEND_OVERALL_WITH_HINTS_QUERY = (
+        "recommend_next_action_overall_with_hint("
+        "{player}, Objective, Item, NeededRaw, Hints)"
+    )
+    RECOMMEND_FOR_OBJECTIVE_QUERY = (
+        "recommend_next_action({player}, {objective}, Item, NeededRaw)"
+    )
+    BULK_REPORT_QUERY = (
+        "bulk_report({player}, [{objectives}], DefaultOrder, "
+        "NextObj, NextMissing, Obj, Item, NeededRaw, Hints, "
+        "PerItems, PerRaw, PerMissing)"
+    )
+    RECOMMEND_ALL_OBJECTIVES_QUERY = (
+        "concurrent_objective_reports({player}, [{objectives}], {threads}, "
+        "Items, NeededRaws)"
+    )
+
+    # One consulted engine per knowledge-base file, shared by all instances.
+    _engines: Dict[str, Prolog] = {}
+    _engines_lock = threading.Lock()
+
+    # Live instances, so invalidate() can reach every instance's caches.
+    _instances: "weakref.WeakSet[WompusCraftExpertSystem]" = weakref.WeakSet()
+
     def __init__(self, prolog_file: str = "wompuscraft.pl") -> None:
-        self.prolog = Prolog()
-        self.prolog.consult(prolog_file)
+        self.prolog = self._engine_for(prolog_file)
+
+        # Per-instance memoization of the query helpers (keyed only by the
+        # string arguments), so the caches die with the instance.
+        cache = functools.lru_cache(maxsize=1024)
+        self._missing_items_cached = cache(self._query_missing_items)
+        self._next_objective_cached = cache(self._query_next_objective)
+        self._recommend_overall_cached = cache(self._query_recommend_overall)
+        self._recommend_overall_with_hints_cached = cache(
+            self._query_recommend_overall_with_hints
+        )
+        self._recommend_for_objective_cached = cache(
+            self._query_recommend_for_objective
+        )
+        self._bulk_cached = cache(self._query_bulk)
+        self._recommend_all_objectives_cached = cache(
+            self._query_recommend_all_objectives
+        )
+        self._instances.add(self)
+
+    @classmethod
+    def _engine_for(cls, prolog_file: str) -> Prolog:
+        """
+        Return the shared engine for prolog_file, consulting it (and setting
+        up tabling) the first time it is requested.
+        """
+        key = os.path.abspath(prolog_file)
+        with cls._engines_lock:
+            engine = cls._engines.get(key)
+            if engine is None:
+                engine = Prolog()
+                engine.consult(prolog_file)
+                list(engine.query("use_module(library(tabling))"))
+                for indicator in cls.TABLED_PREDICATES:
+                    list(engine.query(f"table({indicator})"))
+                cls._engines[key] = engine
+        return engine
+
+    def abolish_all_tables(self) -> None:
+        """
+        Discard all tabled answers in the Prolog engine, so they are
+        re-derived from the current game state on the next query.
+        """
+        list(self.prolog.query("abolish_all_tables"))
+
+    def _one(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the first solution of query (or None), closing the pyswip
+        query right away instead of building a list of solutions.
+        """
+        # pyswip's query() is a generator; closing it releases the query
+        # (and its choicepoints) immediately rather than at GC time.
+        solutions = self.prolog.query(query, maxresult=1)
+        try:
+            return next(solutions, None)
+        finally:
+            solutions.close()
 
     def _convert_needed_raw(
         self, needed_raw_term: Any
-    ) -> List[Dict[str, Any]]:
+    ) -> List[NeededRaw]:
         """
         Convert a Prolog list like [3-wood_log, 2-stick] into
-        [{'item': 'wood_log', 'qty': 3}, ...]
+        [NeededRaw(item='wood_log', qty=3), ...]
+        """
+        pairs = list(needed_raw_term)
+        # pyswip's query() normalizes each pair to text like "-(3, wood_log)";
+        # take the single-regex path for those and keep the generic one for
+        # anything else.
+        try:
+            return self._convert_needed_raw_terms(pairs)
+        except (AttributeError, IndexError, TypeError, ValueError):
+            return self._convert_needed_raw_generic(pairs)
+
+    @staticmethod
+    def _convert_needed_raw_terms(pairs: List[Any]) -> List[NeededRaw]:
         """
-        result: List[Dict[str, Any]] = []
-        for pair in needed_raw_term:
+        Fast path for a list of normalized "-(Qty, Item)" strings, as
+        pyswip returns them. Raises ValueError if any pair has another shape.
+        """
+        matches = [_PAIR_TERM_RE.fullmatch(pair) for pair in pairs]
+        if not all(matches):
+            raise ValueError("not a list of normalized qty-item terms")
+        return [NeededRaw(m.group(2), int(m.group(1))) for m in matches]
+
+    def _convert_needed_raw_generic(
+        self, pairs: List[Any]
+    ) -> List[NeededRaw]:
+        """
+        Slow path accepting any of the qty-item encodings pyswip or callers
+        may produce ("-(3, wood_log)" or "3-wood_log" string, Structure,
+        tuple, ...).
+        """
+        result: List[NeededRaw] = []
+        for pair in pairs:
             # Support pyswip Structure (.value) and already-string/tuple forms.
             qty_term: Union[str, int, Any]
             item_term: Any
 
-            if hasattr(pair, "value"):
+            term_match = None
+            if isinstance(pair, str):
+                term_match = _PAIR_TERM_RE.fullmatch(pair)
+            if term_match:
+                qty_term, item_term = term_match.group(1), term_match.group(2)
+            elif hasattr(pair, "value") and not isinstance(pair.value, str):
                 qty_term, item_term = pair.value  # type: ignore[attr-defined]
             elif isinstance(pair, (list, tuple)) and len(pair) == 2:
                 qty_term, item_term = pair
@@ -39,9 +213,11 @@ class WompusCraftExpertSystem:
                     qty_term, item_term = pair[0], pair[1]
                 except Exception as exc:  # pragma: no cover - defensive path
                     # Last resort: try regex on the string form "3-wood_log"
-                    import re
-
-                    m = re.match(r"\s*(-?\d+)\s*-\s*(\w+)", str(pair))
+                    # or "-(3, wood_log)" (e.g. an unnormalized Functor)
+                    text = str(pair)
+                    m = _QTY_ITEM_RE.match(text) or _PAIR_TERM_RE.fullmatch(
+                        text
+                    )
                     if m:
                         qty_term, item_term = m.group(1), m.group(2)
                     else:
@@ -55,9 +231,7 @@ class WompusCraftExpertSystem:
 
             if qty_str == "" or item_str == "":
                 # Try parsing both sides from the whole pair string
-                import re
-
-                m = re.match(r"\s*(-?\d+)\s*-\s*(\w+)", str(pair))
+                m = _QTY_ITEM_RE.match(str(pair))
                 if m:
                     if qty_str == "":
                         qty_str = m.group(1)
@@ -71,7 +245,7 @@ class WompusCraftExpertSystem:
 
             qty = int(qty_str)
             item = item_str if item_str else str(item_term)
-            result.append({"item": item, "qty": qty})
+            result.append(NeededRaw(item, qty))
         return result
 
     def _convert_simple_list(self, term_list: Any) -> List[str]:
@@ -80,6 +254,14 @@ class WompusCraftExpertSystem:
         """
         return [str(h) for h in term_list]
 
+    @staticmethod
+    def _optional_atom(term: Any) -> Optional[str]:
+        """
+        Map the `none` placeholder used by bulk_report/12 to None.
+        """
+        value = str(term)
+        return None if value == "none" else value
+
     def _convert_hints(self, hints_term: Any) -> List[str]:
         """
         Convert Prolog hint list (e.g. [mine_near_surface, chop_nearby_trees])
@@ -87,44 +269,108 @@ class WompusCraftExpertSystem:
         """
         return self._convert_simple_list(hints_term)
 
+    def _freeze_needed_raw(self, needed_raw_term: Any) -> FrozenNeededRaw:
+        return tuple(self._convert_needed_raw(needed_raw_term))
+
+    @staticmethod
+    def _thaw_needed_raw(needed_raw: FrozenNeededRaw) -> List[NeededRaw]:
+        # NeededRaw entries are immutable, so they can be shared as-is.
+        return list(needed_raw)
+
+    def invalidate(self) -> None:
+        """
+        Drop memoized query results and tabled answers, e.g. after the
+        player's inventory has been changed in the knowledge base.
+
+        All instances share the one embedded SWI-Prolog runtime, so this
+        is global: it clears the caches of every instance, not just this
+        one, together with every tabled answer in the engine.
+        """
+        for instance in list(self._instances):
+            instance._clear_caches()
+        self.abolish_all_tables()
+
+    def _clear_caches(self) -> None:
+        for helper in (
+            self._missing_items_cached,
+            self._next_objective_cached,
+            self._recommend_overall_cached,
+            self._recommend_overall_with_hints_cached,
+            self._recommend_for_objective_cached,
+            self._bulk_cached,
+            self._recommend_all_objectives_cached,
+        ):
+            helper.cache_clear()
+        self.__dict__.pop("_default_objectives", None)
+
+    def _query_missing_items(
+        self, player: str, objective: str
+    ) -> Tuple[str, ...]:
+        query = self.MISSING_ITEMS_QUERY.format(
+            player=_atom(player), objective=_atom(objective)
+        )
+        sol = self._one(query)
+        if sol is None:
+            return ()
+        return tuple(self._convert_simple_list(sol["Missing"]))
+
     def missing_items(
         self, player: str, objective: str
     ) -> List[str]:
         """
         Return the list of missing items for a given objective.
         """
-        query = f"missing_items({player}, {objective}, Missing)"
-        solutions = list(self.prolog.query(query, maxresult=1))
-        if not solutions:
-            return []
-        return self._convert_simple_list(solutions[0]["Missing"])
+        return list(self._missing_items_cached(player, objective))
+
+    def _query_next_objective(
+        self, player: str
+    ) -> Tuple[Optional[str], Tuple[str, ...]]:
+        query = self.NEXT_OBJECTIVE_QUERY.format(player=_atom(player))
+        sol = self._one(query)
+        if sol is None:
+            return None, ()
+        return (
+            str(sol["Objective"]),
+            tuple(self._convert_simple_list(sol["Missing"])),
+        )
 
     def next_objective(self, player: str) -> Dict[str, Any]:
         """
         Return the next objective and its missing items.
         """
-        query = "next_objective({player}, Objective, Missing)".format(
-            player=player
-        )
-        solutions = list(self.prolog.query(query, maxresult=1))
-        if not solutions:
-            return {"objective": None, "missing": []}
-        sol = solutions[0]
+        objective, missing = self._next_objective_cached(player)
         return {
-            "objective": str(sol["Objective"]),
-            "missing": self._convert_simple_list(sol["Missing"]),
+            "objective": objective,
+            "missing": list(missing),
         }
 
+    @functools.cached_property
+    def _default_objectives(self) -> Tuple[str, ...]:
+        sol = self._one(self.DEFAULT_OBJECTIVES_QUERY)
+        if sol is None:
+            return ()
+        return tuple(self._convert_simple_list(sol["Objs"]))
+
     def default_objectives(self) -> List[str]:
         """
         Return the default objective order.
         """
-        solutions = list(
-            self.prolog.query("default_objective_order(Objs)", maxresult=1)
+        return list(self._default_objectives)
+
+    def _query_recommend_overall(
+        self, player: str
+    ) -> Tuple[Optional[str], Optional[str], FrozenNeededRaw]:
+        query = self.RECOMMEND_OVERALL_QUERY.format(player=_atom(player))
+        sol = self._one(query)
+
+        if sol is None:
+            return None, None, ()
+
+        return (
+            str(sol["Objective"]),
+            str(sol["Item"]),
+            self._freeze_needed_raw(sol["NeededRaw"]),
         )
-        if not solutions:
-            return []
-        return self._convert_simple_list(solutions[0]["Objs"])
 
     def recommend_next_action_overall(self, player: str) -> Dict[str, Any]:
         """
@@ -132,30 +378,31 @@ class WompusCraftExpertSystem:
         what is the next objective, what item should they craft, and
         what raw resources are required?
         """
-        query = (
-            f"recommend_next_action_overall({player}, Objective, "
-            f"Item, NeededRaw)"
-        )
-        solutions = list(self.prolog.query(query, maxresult=1))
-
-        if not solutions:
-            return {
-                "objective": None,
-                "item": None,
-                "needed_raw": [],
-            }
-
-        sol = solutions[0]
-        objective = str(sol["Objective"])
-        item = str(sol["Item"])
-        needed_raw = self._convert_needed_raw(sol["NeededRaw"])
-
+        objective, item, needed_raw = self._recommend_overall_cached(player)
         return {
             "objective": objective,
             "item": item,
-            "needed_raw": needed_raw,
+            "needed_raw": self._thaw_needed_raw(needed_raw),
         }
 
+    def _query_recommend_overall_with_hints(
+        self, player: str
+    ) -> Tuple[Optional[str], Optional[str], FrozenNeededRaw, Tuple[str, ...]]:
+        query = self.RECOMMEND_OVERALL_WITH_HINTS_QUERY.format(
+            player=_atom(player)
+        )
+        sol = self._one(query)
+
+        if sol is None:
+            return None, None, (), ()
+
+        return (
+            str(sol["Objective"]),
+            str(sol["Item"]),
+            self._freeze_needed_raw(sol["NeededRaw"]),
+            tuple(self._convert_hints(sol["Hints"])),
+        )
+
     def recommend_next_action_overall_with_hints(
         self, player: str
     ) -> Dict[str, Any]:
@@ -163,33 +410,29 @@ class WompusCraftExpertSystem:
         Same as above, but also returns hints about where to get each
         required raw material.
         """
-        query = (
-            "recommend_next_action_overall_with_hint("
-            f"{player}, Objective, Item, NeededRaw, Hints)"
+        objective, item, needed_raw, hints = (
+            self._recommend_overall_with_hints_cached(player)
         )
-        solutions = list(self.prolog.query(query, maxresult=1))
-
-        if not solutions:
-            return {
-                "objective": None,
-                "item": None,
-                "needed_raw": [],
-                "hints": [],
-            }
-
-        sol = solutions[0]
-        objective = str(sol["Objective"])
-        item = str(sol["Item"])
-        needed_raw = self._convert_needed_raw(sol["NeededRaw"])
-        hints = self._convert_hints(sol["Hints"])
-
         return {
             "objective": objective,
             "item": item,
-            "needed_raw": needed_raw,
-            "hints": hints,
+            "needed_raw": self._thaw_needed_raw(needed_raw),
+            "hints": list(hints),
         }
 
+    def _query_recommend_for_objective(
+        self, player: str, objective: str
+    ) -> Tuple[Optional[str], FrozenNeededRaw]:
+        query = self.RECOMMEND_FOR_OBJECTIVE_QUERY.format(
+            player=_atom(player), objective=_atom(objective)
+        )
+        sol = self._one(query)
+
+        if sol is None:
+            return None, ()
+
+        return str(sol["Item"]), self._freeze_needed_raw(sol["NeededRaw"])
+
     def recommend_for_objective(
         self, player: str, objective: str
     ) -> Dict[str, Any]:
@@ -197,24 +440,130 @@ class WompusCraftExpertSystem:
         Ask for the next item specifically for a single objective
         (ignoring global ordering).
         """
-        query = (
-            f"recommend_next_action({player}, {objective}, Item, NeededRaw)"
+        item, needed_raw = self._recommend_for_objective_cached(
+            player, objective
         )
-        solutions = list(self.prolog.query(query, maxresult=1))
+        return {
+            "objective": objective,
+            "item": item,
+            "needed_raw": self._thaw_needed_raw(needed_raw),
+        }
 
-        if not solutions:
-            return {
+    def _query_bulk(
+        self, player: str, objectives: Tuple[str, ...]
+    ) -> Tuple[Any, ...]:
+        query = self.BULK_REPORT_QUERY.format(
+            player=_atom(player),
+            objectives=", ".join(_atom(obj) for obj in objectives),
+        )
+        sol = self._one(query)
+        if sol is None:
+            return (), None, (), None, None, (), (), ()
+
+        per_objective = tuple(
+            (
+                self._optional_atom(item),
+                self._freeze_needed_raw(raw),
+                tuple(self._convert_simple_list(missing)),
+            )
+            for item, raw, missing in zip(
+                sol["PerItems"], sol["PerRaw"], sol["PerMissing"]
+            )
+        )
+        return (
+            tuple(self._convert_simple_list(sol["DefaultOrder"])),
+            self._optional_atom(sol["NextObj"]),
+            tuple(self._convert_simple_list(sol["NextMissing"])),
+            self._optional_atom(sol["Obj"]),
+            self._optional_atom(sol["Item"]),
+            self._freeze_needed_raw(sol["NeededRaw"]),
+            tuple(self._convert_hints(sol["Hints"])),
+            per_objective,
+        )
+
+    def bulk(
+        self, player: str, objectives: Sequence[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        Answer the usual set of questions for a player in a single Prolog
+        query: the default objective order, the next objective, the global
+        recommendation with hints, and a per-objective drill-down
+        (recommendation and missing items) for each of `objectives`.
+        """
+        objectives = tuple(objectives)
+        (
+            default_order,
+            next_obj,
+            next_missing,
+            objective,
+            item,
+            needed_raw,
+            hints,
+            per_objective,
+        ) = self._bulk_cached(player, objectives)
+        return {
+            "default_objectives": list(default_order),
+            "next_objective": {
+                "objective": next_obj,
+                "missing": list(next_missing),
+            },
+            "recommendation": {
                 "objective": objective,
-                "item": None,
-                "needed_raw": [],
-            }
+                "item": item,
+                "needed_raw": self._thaw_needed_raw(needed_raw),
+                "hints": list(hints),
+            },
+            "objectives": {
+                obj: {
+                    "objective": obj,
+                    "item": obj_item,
+                    "needed_raw": self._thaw_needed_raw(obj_raw),
+                    "missing": list(obj_missing),
+                }
+                for obj, (obj_item, obj_raw, obj_missing) in zip(
+                    objectives, per_objective
+                )
+            },
+        }
 
-        sol = solutions[0]
-        item = str(sol["Item"])
-        needed_raw = self._convert_needed_raw(sol["NeededRaw"])
+    def _query_recommend_all_objectives(
+        self, player: str, objectives: Tuple[str, ...]
+    ) -> Tuple[Tuple[Optional[str], FrozenNeededRaw], ...]:
+        # One worker per objective, but no more than there are CPUs.
+        threads = max(1, min(len(objectives), os.cpu_count() or 1))
+        query = self.RECOMMEND_ALL_OBJECTIVES_QUERY.format(
+            player=_atom(player),
+            objectives=", ".join(_atom(obj) for obj in objectives),
+            threads=threads,
+        )
+        sol = self._one(query)
+        if sol is None:
+            return tuple((None, ()) for _ in objectives)
 
+        return tuple(
+            (self._optional_atom(item), self._freeze_needed_raw(raw))
+            for item, raw in zip(sol["Items"], sol["NeededRaws"])
+        )
+
+    def recommend_all_objectives(
+        self, player: str, objectives: Optional[Sequence[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Like recommend_for_objective(), but for many objectives at once
+        (the default objective order if none are given). The per-objective
+        goals are independent, so Prolog solves them on parallel threads.
+        """
+        if objectives is None:
+            objectives = self._default_objectives
+        objectives = tuple(objectives)
+        if not objectives:
+            return {}
+        results = self._recommend_all_objectives_cached(player, objectives)
         return {
-            "objective": objective,
-            "item": item,
-            "needed_raw": needed_raw,
+            obj: {
+                "objective": obj,
+                "item": item,
+                "needed_raw": self._thaw_needed_raw(needed_raw),
+            }
+            for obj, (item, needed_raw) in zip(objectives, results)
         }